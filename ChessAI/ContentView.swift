@@ -106,8 +106,21 @@ final class Board: ObservableObject {
     @Published var aiEnabled = false
     @Published var lastAIMove: String?
     
+    // One bit per square (row * 8 + col) so move generation can test occupancy
+    // without scanning `pieces`. Rebuilt on reset, then kept in step by
+    // movePiece so a move only touches the squares it changes.
+    private var whiteOccupancy: UInt64 = 0
+    private var blackOccupancy: UInt64 = 0
+    // Square lookup for views, so each of the 64 squares doesn't scan `pieces`.
+    private var pieceAt: [Position: Piece] = [:]
+    // Destinations per piece for the current position. SAN parsing and
+    // taps ask for the same pieces repeatedly; any move clears it.
+    private var destinationCache: [UUID: Set<Position>] = [:]
+    
     init() { reset() }
     
+    func piece(at position: Position) -> Piece? { pieceAt[position] }
+    
     func tap(at p: Position) {
         // Only allow human player (white) to make moves manually
         guard turn == .white else { return }
@@ -121,7 +134,7 @@ final class Board: ObservableObject {
             return
         }
         deselect()
-        if let piece = pieces.first(where: { $0.pos == p && $0.player == turn }) {
+        if let piece = self.piece(at: p), piece.player == turn {
             selected = piece
             highlights = legalDestinations(for: piece)
         }
@@ -253,19 +266,26 @@ final class Board: ObservableObject {
     }
     
     private func makeRandomLegalMove() {
-        let playerPieces = pieces.filter { $0.player == turn }.shuffled()
-        for piece in playerPieces {
-            let destinations = legalDestinations(for: piece)
-            if let randomDestination = destinations.randomElement() {
-                movePiece(piece, to: randomDestination)
-                return
+        // Reservoir sampling: one pass over the legal moves, uniform choice,
+        // no filtered/shuffled piece array or move list.
+        var chosen: (piece: Piece, destination: Position)?
+        var seen = 0
+        for piece in pieces where piece.player == turn {
+            for destination in legalDestinations(for: piece) {
+                seen += 1
+                if Int.random(in: 0..<seen) == 0 { chosen = (piece, destination) }
             }
         }
+        if let chosen {
+            movePiece(chosen.piece, to: chosen.destination)
+            return
+        }
         turn = turn == .white ? .black : .white
     }
     
     func reset() {
         pieces = Self.startingLineUp()
+        rebuildIndexes()
         turn = .white  // Human always starts as white
         lastAIMove = nil
         deselect()
@@ -275,58 +295,73 @@ final class Board: ObservableObject {
     private func deselect() { selected = nil; highlights = [] }
     
     private func movePiece(_ piece: Piece, to p: Position, promoteTo: Kind? = nil) {
-        if let captureIndex = pieces.firstIndex(where: { $0.pos == p }) {
-            guard pieces[captureIndex].player != piece.player else { return }
-            pieces.remove(at: captureIndex)
+        if let captured = pieceAt[p] {
+            guard captured.player != piece.player else { return }
+            pieces.removeAll { $0.id == captured.id }
+            removeFromIndexes(captured)
         }
-        pieces.replace(piece) {
-            $0.pos = p
-            if let promoteTo { $0.kind = promoteTo }
+        if let idx = pieces.firstIndex(where: { $0.id == piece.id }) {
+            removeFromIndexes(pieces[idx])
+            pieces[idx].pos = p
+            if let promoteTo { pieces[idx].kind = promoteTo }
+            addToIndexes(pieces[idx])
         }
         turn = turn == .white ? .black : .white
         deselect()
     }
     
     private func legalDestinations(for piece: Piece) -> Set<Position> {
+        if let cached = destinationCache[piece.id] { return cached }
+        let destinations = generateDestinations(for: piece)
+        destinationCache[piece.id] = destinations
+        return destinations
+    }
+    
+    private func generateDestinations(for piece: Piece) -> Set<Position> {
         switch piece.kind {
         case .pawn:
             return pawnDestinations(for: piece)
         case .rook:
-            return Set(slidingMoves(from: piece.pos, directions: [(1, 0), (-1, 0), (0, 1), (0, -1)], for: piece))
+            return Set(slidingMoves(from: piece.pos, directions: Self.rookDirections, for: piece))
         case .bishop:
-            return Set(slidingMoves(from: piece.pos, directions: [(1, 1), (1, -1), (-1, 1), (-1, -1)], for: piece))
+            return Set(slidingMoves(from: piece.pos, directions: Self.bishopDirections, for: piece))
         case .queen:
-            return Set(slidingMoves(from: piece.pos,
-                                     directions: [(1, 0), (-1, 0), (0, 1), (0, -1),
-                                                  (1, 1), (1, -1), (-1, 1), (-1, -1)],
-                                     for: piece))
+            return Set(slidingMoves(from: piece.pos, directions: Self.queenDirections, for: piece))
         case .knight:
-            let offsets = [(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)]
-            var moves: Set<Position> = []
-            for (dr, dc) in offsets {
-                let destination = Position(row: piece.pos.row + dr, col: piece.pos.col + dc)
-                guard contains(destination) else { continue }
-                if let occupant = occupant(of: destination) {
-                    if occupant.player != piece.player { moves.insert(destination) }
-                } else {
-                    moves.insert(destination)
-                }
-            }
-            return moves
+            return jumpDestinations(from: piece.pos, table: Self.knightTargets, for: piece.player)
         case .king:
-            var moves: Set<Position> = []
-            for dr in -1...1 {
-                for dc in -1...1 where dr != 0 || dc != 0 {
-                    let destination = Position(row: piece.pos.row + dr, col: piece.pos.col + dc)
-                    guard contains(destination) else { continue }
-                    if let occupant = occupant(of: destination) {
-                        if occupant.player != piece.player { moves.insert(destination) }
-                    } else {
-                        moves.insert(destination)
-                    }
-                }
+            return jumpDestinations(from: piece.pos, table: Self.kingTargets, for: piece.player)
+        }
+    }
+    
+    // Knight and king targets are fixed per square, so look them up and mask
+    // out our own pieces instead of probing each offset.
+    private func jumpDestinations(from start: Position, table: [UInt64], for player: Player) -> Set<Position> {
+        let own = player == .white ? whiteOccupancy : blackOccupancy
+        var targets = table[start.row * 8 + start.col] & ~own
+        var moves: Set<Position> = []
+        while targets != 0 {
+            let square = targets.trailingZeroBitCount
+            moves.insert(Position(row: square / 8, col: square % 8))
+            targets &= targets - 1
+        }
+        return moves
+    }
+    
+    private static let rookDirections = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    private static let bishopDirections = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+    private static let queenDirections = rookDirections + bishopDirections
+    private static let knightTargets = jumpTable([(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)])
+    private static let kingTargets = jumpTable(queenDirections)
+    
+    private static func jumpTable(_ offsets: [(Int, Int)]) -> [UInt64] {
+        (0..<64).map { square in
+            offsets.reduce(UInt64(0)) { mask, offset in
+                let row = square / 8 + offset.0
+                let col = square % 8 + offset.1
+                guard (0..<8).contains(row), (0..<8).contains(col) else { return mask }
+                return mask | bit(Position(row: row, col: col))
             }
-            return moves
         }
     }
     
@@ -335,23 +370,25 @@ final class Board: ObservableObject {
         let direction = piece.player == .white ? -1 : 1
         let startRow = piece.player == .white ? 6 : 1
         let oneForward = Position(row: piece.pos.row + direction, col: piece.pos.col)
-        if contains(oneForward) && occupant(of: oneForward) == nil {
+        if contains(oneForward) && occupantsPlayer(at: oneForward) == nil {
             moves.insert(oneForward)
             let twoForward = Position(row: piece.pos.row + 2 * direction, col: piece.pos.col)
-            if piece.pos.row == startRow && occupant(of: twoForward) == nil {
+            if piece.pos.row == startRow && occupantsPlayer(at: twoForward) == nil {
                 moves.insert(twoForward)
             }
         }
-        for deltaCol in [-1, 1] {
+        for deltaCol in Self.pawnCaptureColumns {
             let capturePos = Position(row: piece.pos.row + direction, col: piece.pos.col + deltaCol)
-            guard contains(capturePos), let target = occupant(of: capturePos) else { continue }
-            if target.player != piece.player {
+            guard contains(capturePos), let owner = occupantsPlayer(at: capturePos) else { continue }
+            if owner != piece.player {
                 moves.insert(capturePos)
             }
         }
         return moves
     }
     
+    private static let pawnCaptureColumns = [-1, 1]
+    
     private func slidingMoves(from start: Position, directions: [(Int, Int)], for piece: Piece) -> [Position] {
         var positions: [Position] = []
         for (dr, dc) in directions {
@@ -359,8 +396,8 @@ final class Board: ObservableObject {
             var col = start.col + dc
             while contains(Position(row: row, col: col)) {
                 let destination = Position(row: row, col: col)
-                if let occupant = occupant(of: destination) {
-                    if occupant.player != piece.player {
+                if let owner = occupantsPlayer(at: destination) {
+                    if owner != piece.player {
                         positions.append(destination)
                     }
                     break
@@ -375,8 +412,41 @@ final class Board: ObservableObject {
     }
     
     private func contains(_ p: Position) -> Bool { (0..<8).contains(p.row) && (0..<8).contains(p.col) }
-    private func occupant(of p: Position) -> Piece? { pieces.first { $0.pos == p } }
-    private func occupantsPlayer(at position: Position) -> Player? { occupant(of: position)?.player }
+    private func occupantsPlayer(at position: Position) -> Player? {
+        let mask = Self.bit(position)
+        if whiteOccupancy & mask != 0 { return .white }
+        if blackOccupancy & mask != 0 { return .black }
+        return nil
+    }
+    
+    private static func bit(_ p: Position) -> UInt64 { UInt64(1) << (p.row * 8 + p.col) }
+    
+    private func rebuildIndexes() {
+        var white: UInt64 = 0
+        var black: UInt64 = 0
+        var lookup: [Position: Piece] = [:]
+        lookup.reserveCapacity(pieces.count)
+        for piece in pieces {
+            if piece.player == .white { white |= Self.bit(piece.pos) } else { black |= Self.bit(piece.pos) }
+            lookup[piece.pos] = piece
+        }
+        whiteOccupancy = white
+        blackOccupancy = black
+        pieceAt = lookup
+        destinationCache.removeAll(keepingCapacity: true)
+    }
+    
+    private func addToIndexes(_ piece: Piece) {
+        if piece.player == .white { whiteOccupancy |= Self.bit(piece.pos) } else { blackOccupancy |= Self.bit(piece.pos) }
+        pieceAt[piece.pos] = piece
+        destinationCache.removeAll(keepingCapacity: true)
+    }
+    
+    private func removeFromIndexes(_ piece: Piece) {
+        if piece.player == .white { whiteOccupancy &= ~Self.bit(piece.pos) } else { blackOccupancy &= ~Self.bit(piece.pos) }
+        pieceAt[piece.pos] = nil
+        destinationCache.removeAll(keepingCapacity: true)
+    }
     
     private func fileIndex(from char: Character) -> Int? {
         guard let ascii = char.asciiValue else { return nil }
@@ -512,15 +582,21 @@ struct ChessView: View {
             ForEach(0..<8, id: \.self) { row in
                 HStack(spacing: 0) {
                     ForEach(0..<8, id: \.self) { col in
-                        Square(pos: Position(row: row, col: col))
+                        let pos = Position(row: row, col: col)
+                        Square(pos: pos,
+                               piece: board.piece(at: pos),
+                               isSelected: board.selected?.pos == pos,
+                               isHighlight: board.highlights.contains(pos),
+                               onTap: { board.tap(at: pos) })
+                            .equatable()
                     }
                 }
             }
         }
+        .background(BoardBackground())
         .frame(width: side, height: side)
         .clipShape(RoundedRectangle(cornerRadius: 12))
         .shadow(color: .black.opacity(0.2), radius: 10)
-        .environmentObject(board)
     }
     
     private var controls: some View {
@@ -550,36 +626,47 @@ struct ChessView: View {
     }
 }
 
-struct Square: View {
+// Squares take plain values instead of observing the whole board, so with
+// `.equatable()` only squares whose contents changed are re-rendered.
+struct Square: View, Equatable {
     let pos: Position
-    @EnvironmentObject private var board: Board
-    private var piece: Piece? { board.pieces.first { $0.pos == pos } }
-    private var isLight: Bool { (pos.row + pos.col).isMultiple(of: 2) }
-    private var isSelected: Bool { board.selected?.pos == pos }
-    private var isHighlight: Bool { board.highlights.contains(pos) }
+    let piece: Piece?
+    let isSelected: Bool
+    let isHighlight: Bool
+    let onTap: () -> Void
+    // Shared by all 64 squares instead of being rebuilt in every body pass.
+    private static let pieceFont = Font.system(size: 36)
+    private static let selectionTint = Color.accentColor.opacity(0.35)
+    private static let selectionSpring = Animation.spring(response: 0.2, dampingFraction: 0.6)
+    
+    static func == (lhs: Square, rhs: Square) -> Bool {
+        lhs.pos == rhs.pos && lhs.piece == rhs.piece
+            && lhs.isSelected == rhs.isSelected && lhs.isHighlight == rhs.isHighlight
+    }
     
     var body: some View {
         ZStack {
-            Color(isLight ? UIColor.systemGray5 : UIColor.systemGray6)
+            Color.clear
                 .overlay(selectionOverlay)
             pieceView
             highlightDot
         }
-        .onTapGesture { board.tap(at: pos) }
+        .contentShape(Rectangle())
+        .onTapGesture(perform: onTap)
     }
     
     @ViewBuilder
     private var selectionOverlay: some View {
-        if isSelected { Color.accentColor.opacity(0.35) }
+        if isSelected { Self.selectionTint }
     }
     
     @ViewBuilder
     private var pieceView: some View {
         if let piece {
             Text(piece.glyph)
-                .font(.system(size: 36))
+                .font(Self.pieceFont)
                 .scaleEffect(isSelected ? 1.15 : 1)
-                .animation(.spring(response: 0.2, dampingFraction: 0.6), value: isSelected)
+                .animation(Self.selectionSpring, value: isSelected)
         }
     }
     
@@ -591,6 +678,25 @@ struct Square: View {
     }
 }
 
+// Static checkerboard drawn once behind the squares. It has no inputs, so board
+// updates never re-render it.
+struct BoardBackground: View {
+    var body: some View {
+        Canvas { context, size in
+            let side = CGSize(width: size.width / 8, height: size.height / 8)
+            var light = Path()
+            for row in 0..<8 {
+                for col in 0..<8 where (row + col).isMultiple(of: 2) {
+                    let origin = CGPoint(x: CGFloat(col) * side.width, y: CGFloat(row) * side.height)
+                    light.addRect(CGRect(origin: origin, size: side))
+                }
+            }
+            context.fill(Path(CGRect(origin: .zero, size: size)), with: .color(Color(UIColor.systemGray6)))
+            context.fill(light, with: .color(Color(UIColor.systemGray5)))
+        }
+    }
+}
+
 struct TurnIndicator: View {
     let player: Player
     var body: some View {
@@ -608,12 +714,3 @@ struct MinimalChessApp: App {
         WindowGroup { ChessView().ignoresSafeArea(.keyboard) }
     }
 }
-
-// MARK: - Helper
-extension Array where Element == Piece {
-    fileprivate mutating func replace(_ piece: Piece, _ update: (inout Piece) -> Void) {
-        if let idx = firstIndex(where: { $0.id == piece.id }) {
-            update(&self[idx])
-        }
-    }
-}
@@ -0,0 +1,22 @@
+"""gunicorn settings for the mock AI server.
+
+Move generation is pure-Python CPU work, so requests are spread over one
+pre-forked worker process per core. The app is imported once in the master
+before forking.
+"""
+import multiprocessing
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "wsgi:app"
+bind = "0.0.0.0:5000"
+workers = multiprocessing.cpu_count()
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Workers inherit the master's RNG state with --preload; reseed so they do
+    # not all answer the same position with the same move.
+    import mock_ai_server
+
+    mock_ai_server.RNG.seed()
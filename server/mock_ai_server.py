@@ -6,13 +6,26 @@ that the SwiftUI client can be exercised end-to-end.
 from __future__ import annotations
 
 import random
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import chess
 from flask import Flask, jsonify, request
 
 app = Flask(__name__)
+# Dedicated generator so move sampling does not go through the shared module
+# state behind random.choice.
+RNG = random.Random()
+# Boards for in-progress games, keyed by the client's gameId, so a request that
+# names the opponent's lastMove can replay it instead of rebuilding the
+# position piece by piece. Least recently used games are evicted first.
+MAX_CACHED_GAMES = 256
+BOARDS: "OrderedDict[str, chess.Board]" = OrderedDict()
+# Cached boards are mutated in place, and the development server handles
+# requests on threads, so cache access and board updates go through one lock.
+BOARDS_LOCK = threading.Lock()
 
 PIECE_MAP: Dict[str, int] = {
     "pawn": chess.PAWN,
@@ -57,6 +70,75 @@ def board_from_payload(payload: Dict[str, object]) -> chess.Board:
     return board
 
 
+def masks_from_payload(payload: Dict[str, object]) -> Tuple[int, ...]:
+    # Same layout as board_masks. Reads the raw dicts rather than going through
+    # PiecePayload: this runs on every cached request and must stay cheaper
+    # than rebuilding the board.
+    masks = [0] * 8
+    for p in payload.get("board", {}).get("pieces", []):
+        bit = chess.BB_SQUARES[chess.square(p["pos"]["col"], 7 - p["pos"]["row"])]
+        masks[0 if p["player"] == "white" else 1] |= bit
+        masks[1 + PIECE_MAP[p["kind"]]] |= bit
+    return tuple(masks)
+
+
+def board_masks(board: chess.Board) -> Tuple[int, ...]:
+    # White, black, then one mask per piece type in chess.PIECE_TYPES order.
+    return (
+        board.occupied_co[chess.WHITE],
+        board.occupied_co[chess.BLACK],
+        board.pawns,
+        board.knights,
+        board.bishops,
+        board.rooks,
+        board.queens,
+        board.kings,
+    )
+
+
+def push_move(board: chess.Board, move: chess.Move) -> None:
+    board.push(move)
+    # board_from_payload cannot know about en passant, so never offer it on a
+    # cached board either; both paths must generate the same moves.
+    board.ep_square = None
+
+
+def cached_board(payload: Dict[str, object]) -> Optional[chess.Board]:
+    game_id = payload.get("gameId")
+    last_move = payload.get("lastMove")
+    board = BOARDS.get(str(game_id)) if game_id and last_move else None
+    if board is None:
+        return None
+    game_id = str(game_id)
+    try:
+        push_move(board, board.parse_uci(last_move))
+    except (TypeError, ValueError):
+        # The client and cache disagree about the game; rebuild from the payload.
+        del BOARDS[game_id]
+        return None
+    # The cache assumes the client applied our last reply. Confirm it against
+    # the pieces every request still carries, kinds included, so a different
+    # promotion landing on the same squares is caught too.
+    current_player = payload.get("currentPlayer", "white")
+    in_sync = board_masks(board) == masks_from_payload(payload)
+    if board.turn != (current_player == "white") or not in_sync:
+        del BOARDS[game_id]
+        return None
+    BOARDS.move_to_end(game_id)
+    return board
+
+
+def remember_board(payload: Dict[str, object], board: chess.Board) -> None:
+    game_id = payload.get("gameId")
+    if not game_id:
+        return
+    game_id = str(game_id)
+    BOARDS[game_id] = board
+    BOARDS.move_to_end(game_id)
+    while len(BOARDS) > MAX_CACHED_GAMES:
+        BOARDS.popitem(last=False)
+
+
 @app.get("/health")
 def health_check():
     return jsonify({"status": "healthy"})
@@ -69,18 +151,27 @@ def ai_move():
     except Exception:
         return jsonify({"success": False, "error": "invalid_json"}), 400
 
-    try:
-        board = board_from_payload(payload)
-    except Exception as exc:  # pragma: no cover - defensive logging
-        return jsonify({"success": False, "error": str(exc)}), 400
-
-    legal_moves: List[chess.Move] = list(board.legal_moves)
-    if not legal_moves:
-        return jsonify({"success": False, "error": "no_legal_moves"})
-
-    move = random.choice(legal_moves)
-    san = board.san(move)
-    return jsonify({"success": True, "move": san})
+    with BOARDS_LOCK:
+        try:
+            board = cached_board(payload) or board_from_payload(payload)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            return jsonify({"success": False, "error": str(exc)}), 400
+
+        # One generation pass into a list is cheaper than count() + islice(), which
+        # walks the legal move generator twice to sample without materializing.
+        legal_moves: List[chess.Move] = list(board.legal_moves)
+        if not legal_moves:
+            return jsonify({"success": False, "error": "no_legal_moves"})
+
+        move = RNG.choice(legal_moves)
+        # SAN needs another legal-move pass to disambiguate, so clients that can
+        # apply UCI may ask for it instead. SAN stays the default for the app.
+        notation = move.uci() if payload.get("format") == "uci" else board.san(move)
+        # Keep the cached board in step with the reply so the next request only
+        # has to apply the opponent's answer.
+        push_move(board, move)
+        remember_board(payload, board)
+        return jsonify({"success": True, "move": notation})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,7 @@
+"""WSGI entry point for serving the mock AI server with gunicorn.
+
+Run from the repository root with ``gunicorn -c server/gunicorn.conf.py``.
+"""
+from mock_ai_server import app
+
+__all__ = ["app"]
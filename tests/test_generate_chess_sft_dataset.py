@@ -0,0 +1,138 @@
+import sys
+from pathlib import Path
+
+import orjson
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import generate_chess_sft_dataset as sft  # noqa: E402
+
+
+def make_pgn(white: str, black: str, moves: str, termination: str = "won by resignation") -> str:
+    return (
+        '[Event "Live Chess"]\n'
+        '[Site "Chess.com"]\n'
+        '[Date "2024.06.01"]\n'
+        f'[White "{white}"]\n'
+        f'[Black "{black}"]\n'
+        '[Result "1-0"]\n'
+        '[ECO "C20"]\n'
+        f'[Termination "{white} {termination}"]\n'
+        "\n"
+        f"{moves}\n"
+    )
+
+
+def test_parse_moves_with_clock_comments():
+    moves = (
+        "1. e4 {[%clk 0:02:59.9]} 1... e5 {[%clk 0:02:58.1]} "
+        "2. Nf3 {[%clk 0:02:57]} 2... Nc6 {[%clk 0:02:55]} 3. Bb5 {[%clk 0:02:50]} 1-0"
+    )
+    assert sft.parse_moves(moves) == (["e4", "Nf3", "Bb5"], ["e5", "Nc6"])
+
+
+def test_parse_moves_without_clock_comments():
+    moves = "1. d4 d5 2. c4 e6 3. Nc3 Nf6 0-1"
+    assert sft.parse_moves(moves) == (["d4", "c4", "Nc3"], ["d5", "e6", "Nf6"])
+
+
+def test_parse_moves_skips_comments_variations_and_nags():
+    moves = (
+        "1. e4 $1 {King's pawn} (1. d4 d5 2. c4) 1... e5 ; main line\n"
+        "2. Nf3 $14 Nc6 3. O-O-O+ exd4 1/2-1/2"
+    )
+    assert sft.parse_moves(moves) == (["e4", "Nf3", "O-O-O+"], ["e5", "Nc6", "exd4"])
+
+
+@pytest.mark.parametrize("result", ["1-0", "0-1", "1/2-1/2", "*"])
+def test_parse_moves_ignores_result(result):
+    assert sft.parse_moves(f"1. e4 e5 2. Qh5 {result}") == (["e4", "Qh5"], ["e5"])
+
+
+def test_parse_moves_empty_section():
+    assert sft.parse_moves("") == ([], [])
+
+
+@pytest.fixture
+def archive():
+    return {
+        "games": [
+            {
+                "time_class": "blitz",
+                "time_control": "180",
+                "pgn": make_pgn("iAMbronze", "rival", "1. e4 e5 2. Nf3 Nc6 3. Bb5 1-0"),
+            },
+            {
+                "time_class": "rapid",
+                "time_control": "600",
+                "pgn": make_pgn(
+                    "rival",
+                    "IAMBRONZE",
+                    "1. d4 {[%clk 0:09:59]} 1... Nf6 {[%clk 0:09:58]} "
+                    "2. c4 {[%clk 0:09:50]} 2... e6 {[%clk 0:09:40]} 0-1",
+                ),
+            },
+            {"time_class": "bullet", "time_control": "60"},
+            {
+                "time_class": "blitz",
+                "time_control": "180",
+                "pgn": make_pgn("someone", "else", "1. e4 c5 1-0"),
+            },
+        ]
+    }
+
+
+def test_pipeline_builds_examples_for_the_user(archive):
+    df = sft.chess_data_to_dataframe([archive])
+    assert len(df) == 4
+    assert df["NumMoves"].tolist() == [3, 2, 0, 1]
+
+    df = sft.enrich_with_player_moves(df, "iambronze")
+    assert df["Color"].tolist() == ["white", "black"]
+
+    examples = list(sft.build_training_examples(df))
+    white = [e for e in examples if e.color == "white"]
+    black = [e for e in examples if e.color == "black"]
+
+    assert [(e.history, e.my_move) for e in white] == [
+        ("", "e4"),
+        ("1. e4 e5", "Nf3"),
+        ("1. e4 e5 2. Nf3 Nc6", "Bb5"),
+    ]
+    assert {(e.time_control, e.opening) for e in white} == {("180", "C20")}
+    assert [e.my_move for e in black] == ["Nf6", "e6"]
+    assert [e.move_number for e in black] == [1, 2]
+
+    record = white[1].to_prompt_completion()
+    assert record == {
+        "prompt": (
+            "Moves so far: 1. e4 e5\n"
+            "Play as white. Give only the next move in SAN (or UCI):"
+        ),
+        "completion": "Nf3\n",
+    }
+
+
+def test_pipeline_drops_abandoned_games(archive):
+    archive["games"][0]["pgn"] = make_pgn(
+        "iAMbronze", "rival", "1. e4 e5 1-0", termination="won - game abandoned"
+    )
+    df = sft.chess_data_to_dataframe([archive], drop_abandoned=True)
+    assert "iAMbronze" not in df["White"].tolist()
+    assert len(df) == 3
+
+
+def test_chess_data_to_dataframe_rejects_empty_archives():
+    with pytest.raises(ValueError):
+        sft.chess_data_to_dataframe([{"games": []}])
+
+
+def test_write_examples_emits_jsonl(tmp_path, archive):
+    df = sft.enrich_with_player_moves(sft.chess_data_to_dataframe([archive]), "iambronze")
+    output = tmp_path / "out" / "sft.jsonl"
+    written = sft.write_examples(sft.build_training_examples(df), output)
+
+    records = [orjson.loads(line) for line in output.read_bytes().splitlines()]
+    assert written == len(records) == 5
+    assert all(set(record) == {"prompt", "completion"} for record in records)